@@ -1,11 +1,36 @@
 import configparser
+from functools import lru_cache
 
 
-config = configparser.ConfigParser()
-config.read("config.ini") 
+# config.ini só é lido no primeiro acesso a uma das constantes abaixo
+_SETTINGS = {
+    "ENCODED_FILE_PATH": ("INPUT FILES", "encoded_file_path"),
+    "QUADGRAMS_FREQUENCY_FILE_PATH": ("INPUT FILES", "quadgrams_frequency_file_path"),
+    "ZERO": ("CONSTANTS", "zero"),
+    "ONE": ("CONSTANTS", "one"),
+}
 
-ENCODED_FILE_PATH = config["INPUT FILES"]["encoded_file_path"]  
-QUADGRAMS_FREQUENCY_FILE_PATH = config["INPUT FILES"]["quadgrams_frequency_file_path"]  
+@lru_cache(maxsize=None)
+def _cfg() -> configparser.ConfigParser:
+    config = configparser.ConfigParser()
+    config.read("config.ini")
+    return config
 
-ZERO = config["CONSTANTS"]["zero"]  
-ONE = config["CONSTANTS"]["one"]
+def __getattr__(name: str) -> str:
+    if name not in _SETTINGS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    section, key = _SETTINGS[name]
+    try:
+        value = _cfg()[section][key]
+    except KeyError:
+        # AttributeError mantém hasattr/getattr(..., default) funcionando
+        raise AttributeError(
+            f"module {__name__!r} has no attribute {name!r}: "
+            f"config.ini has no [{section}] {key}"
+        ) from None
+    # guarda no módulo: os próximos acessos são leituras normais de atributo
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + list(_SETTINGS))
\ No newline at end of file
@@ -1,58 +1,124 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import csv
 import math
-import pandas as pd
+import numpy as np
+import os
 import random
 import string
-from collections import Counter
+import time
+import zipfile
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import ClassVar, Dict, List, NewType, Optional, Tuple
+
+from hillclimb_nb import build_positions, climb_restarts, draw_swaps
 
 
 QUADGRAMS_PATH = "instructions/quadgrams_frequency.txt"
 ENCODED_PATH   = "instructions/encoded_content.txt"
+BIGRAM_MARGIN = 5.0  # filtro de bigramas do hill-climb (em log10)
+LOG_EVERY = True  # False: registra só as transições (sem os "bad candidate")
 ALPHABET = string.ascii_uppercase
 A2I = {c:i for i, c in enumerate(ALPHABET)}
 I2A = {i:c for i, c in enumerate(ALPHABET)}
+ALPHA = np.frombuffer(ALPHABET.encode(), dtype=np.uint8)
+
+# chave de substituição: uint8[26], posição = letra CIPHER (A=0), valor = letra PLAIN
+Key = NewType("Key", np.ndarray)
 
 # ---------------------------
 # Utilidades
 # ---------------------------
+# tabelas para bytes.translate: a–z -> A–Z e remoção de tudo que não for A–Z
+_UPPER = bytes.maketrans(ALPHABET.lower().encode(), ALPHABET.encode())
+_NOT_AZ = bytes(i for i in range(256) if not ord('A') <= i <= ord('Z'))
+
 def only_letters(text: str) -> str:
     """Mantém apenas letras A–Z, tudo maiúsculo."""
-    return "".join(ch for ch in text.upper() if 'A' <= ch <= 'Z')
+    if not text.isascii():
+        # .upper() gera A–Z a partir de não-ASCII ('ß' -> 'SS', 'ﬁ' -> 'FI', 'ı' -> 'I')
+        return "".join(ch for ch in text.upper() if 'A' <= ch <= 'Z')
+    # translate remove antes de mapear, por isso são duas passadas; ainda assim
+    # fica ~10-18x mais rápido que re.sub(rb"[^A-Za-z]", b"", ...).upper()
+    return text.encode("ascii").translate(_UPPER).translate(None, _NOT_AZ).decode("ascii")
+
+def encode_az(text: str) -> np.ndarray:
+    """Converte o texto em índices uint8 (A=0..Z=25), descartando o que não for A–Z."""
+    raw = np.frombuffer(text.encode("utf-8"), dtype=np.uint8)
+    return raw[(raw >= ord('A')) & (raw <= ord('Z'))] - ord('A')
+
+def decode_az(idx: np.ndarray) -> str:
+    """Inverso de encode_az: índices (A=0..Z=25) de volta para texto."""
+    return ALPHA[idx].tobytes().decode("ascii")
 
 def apply_caesar(text: str, shift: int) -> str:
     """Aplica cifra de César com shift (decifra quando shift é negativo)."""
-    return "".join(
-        I2A[(A2I[ch] - shift) % 26] for ch in text if 'A' <= ch <= 'Z'
-    )
+    return decode_az((encode_az(text) + (-shift) % 26) % 26)
 
 def apply_substitution(cipher: str, key_map: Dict[str, str]) -> str:
     """Aplica substituição letra a letra usando o dicionário {CIPHER→PLAIN}."""
-    return "".join(
-        key_map.get(c, c) if 'A' <= c <= 'Z' else c
-        for c in cipher
-    )
+    # só as chaves A–Z contam; a tabela de bytes só serve se os valores forem ASCII
+    az_map = {c: p for c, p in key_map.items() if len(c) == 1 and 'A' <= c <= 'Z'}
+    if not all(len(p) == 1 and p.isascii() for p in az_map.values()):
+        return "".join(
+            az_map.get(c, c) if 'A' <= c <= 'Z' else c
+            for c in cipher
+        )
+
+    lut = np.arange(256, dtype=np.uint8)  # fora de A–Z fica igual
+    for c, p in az_map.items():
+        lut[ord(c)] = ord(p)
+    # bytes UTF-8 de caracteres não-ASCII são >= 128 e passam intactos
+    return lut[np.frombuffer(cipher.encode("utf-8"), dtype=np.uint8)].tobytes().decode("utf-8")
+
+# separadores ASCII de str.split(); com eles e 0/1 o arquivo vai pelo caminho vetorizado
+_SPLIT_WS = b" \t\n\r\x0b\x0c\x1c\x1d\x1e\x1f"
+_BITS7 = 1 << np.arange(6, -1, -1)
 
 def decode_binary_file(path: str) -> str:
     """Lê binários (em texto) e converte para caracteres ASCII."""
     with open(path, "r", encoding="utf-8") as f:
-        tokens = f.read().split()
-
-    chars = []
-    for tok in tokens:
-        try:
-            code = int(tok, 2)
-            # mantêm caracteres imprimíveis e quebra de linha
-            if code == 10:
-                chars.append('\n')
-            elif 32 <= code <= 126 or code == 9:
-                chars.append(chr(code))
-        except ValueError:
-            continue  # ignora tokens inválidos
-    return "".join(chars)
+        content = f.read()
+
+    raw = content.encode("utf-8")
+    if raw.translate(None, b"01" + _SPLIT_WS):
+        # algo além de 0/1 (p.ex. "+1000001", "0b1000001", "100_0001"):
+        # token a token com int(tok, 2), como antes
+        chars = []
+        for tok in content.split():
+            try:
+                code = int(tok, 2)
+                # mantêm caracteres imprimíveis e quebra de linha
+                if code == 10:
+                    chars.append('\n')
+                elif 32 <= code <= 126 or code == 9:
+                    chars.append(chr(code))
+            except ValueError:
+                continue  # ignora tokens inválidos
+        return "".join(chars)
+
+    # só 0/1 e separadores: tudo direto no buffer de bytes, sem laço por token.
+    # Os 7 separadores na frente garantem a janela de 7 bytes antes do fim de cada token.
+    buf = np.frombuffer(b" " * 7 + raw + b" ", dtype=np.uint8)
+    is_digit = buf >= ord("0")
+    edges = np.flatnonzero(is_digit[1:] != is_digit[:-1]) + 1
+    starts, ends = edges[0::2], edges[1::2]
+
+    # código = últimos 7 dígitos de cada token (o que vem antes do início conta como 0)
+    window = ends[:, None] + np.arange(-7, 0)
+    bits = (buf[window] == ord("1")) & (window >= starts[:, None])
+    codes = bits @ _BITS7
+
+    # token com mais de 7 dígitos só vale se o excedente for zeros à esquerda
+    long = np.flatnonzero(ends - starts > 7)
+    if len(long):
+        ones = np.concatenate(([0], np.cumsum(buf == ord("1"))))
+        codes[long[ones[ends[long] - 7] > ones[starts[long]]]] = -1
+
+    # mantêm caracteres imprimíveis e quebra de linha
+    keep = ((codes >= 32) & (codes <= 126)) | (codes == 10) | (codes == 9)
+    return codes[keep].astype(np.uint8).tobytes().decode("ascii")
 
 def get_timestamp():
     return datetime.now().timestamp()
@@ -62,11 +128,27 @@ def get_timestamp():
 # ---------------------------
 @dataclass
 class QuadgramScorer:
-    log_probs: Dict[str, float]
+    table: np.ndarray  # (26,26,26,26) float32 de log10-probabilidades, indexada por A=0..Z=25
     floor: float
+    bigram_table: np.ndarray  # (26,26) float32, bigramas acumulados dos mesmos quad-grams
+
+    # incrementar ao mudar como as tabelas são montadas: invalida os caches .npz
+    TABLES_VERSION: ClassVar[int] = 1
 
     @classmethod
     def from_file(cls, path: str) -> "QuadgramScorer":
+        """Carrega as tabelas a partir do arquivo de frequências. O resultado fica
+        em cache em '<path>.npz', reaproveitado enquanto for mais novo que o arquivo
+        e da mesma TABLES_VERSION; cache ilegível ou antigo é refeito."""
+        cache_path = path + ".npz"
+        if os.path.exists(cache_path) and os.path.getmtime(cache_path) > os.path.getmtime(path):
+            try:
+                with np.load(cache_path) as cached:
+                    if int(cached["version"]) == cls.TABLES_VERSION:
+                        return cls(cached["table"], float(cached["floor"]), cached["bigram_table"])
+            except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile):
+                pass  # corrompido/truncado: volta a ler o arquivo texto
+
         counts = {}
         total = 0
         with open(path, "r", encoding="utf-8") as f:
@@ -78,29 +160,49 @@ class QuadgramScorer:
                 if len(gram) == 4 and all('A' <= c <= 'Z' for c in gram):
                     counts[gram] = cnt
                     total += cnt
-        # prob log10
-        log_probs = {g: math.log10(c/total) for g, c in counts.items()}
+        # prob log10; grams ausentes ficam com o floor
         floor = math.log10(0.01/total)  # prob. muito pequena para grams ausentes
-        return cls(log_probs, floor)
+        table = np.full((26, 26, 26, 26), floor, dtype=np.float32)
+        bigram_counts = np.zeros((26, 26), dtype=np.float64)
+        for g, c in counts.items():
+            table[A2I[g[0]], A2I[g[1]], A2I[g[2]], A2I[g[3]]] = math.log10(c/total)
+            bigram_counts[A2I[g[0]], A2I[g[1]]] += c
+        bigram_table = np.full((26, 26), floor, dtype=np.float32)
+        seen = bigram_counts > 0
+        bigram_table[seen] = np.log10(bigram_counts[seen] / total)
+
+        try:
+            np.savez(cache_path, table=table, floor=floor, bigram_table=bigram_table,
+                     version=cls.TABLES_VERSION)
+        except OSError:
+            pass  # sem permissão de escrita: só não faz cache
+        return cls(table, floor, bigram_table)
 
     def score(self, text: str) -> float:
-        t = only_letters(text)
+        return self._score_letters(only_letters(text))
+
+    def _score_letters(self, t: str) -> float:
+        """Como score, mas assume que 't' já passou por only_letters."""
         if len(t) < 4:
             return -1e9
-        s = 0.0
-        for i in range(len(t)-3):
-            g = t[i:i+4]
-            s += self.log_probs.get(g, self.floor)
-        return s
+        idx = encode_az(t)
+        return float(self.table[idx[:-3], idx[1:-2], idx[2:-1], idx[3:]].sum(dtype=np.float64))
+
+def quadgram_sum(table: np.ndarray, plain_arr: np.ndarray, starts: np.ndarray) -> float:
+    """Soma as log-probabilidades dos quad-grams que começam em 'starts'."""
+    return float(table[
+        plain_arr[starts], plain_arr[starts+1], plain_arr[starts+2], plain_arr[starts+3]
+    ].sum(dtype=np.float64))
 
 # ---------------------------
 # Quebra por César (força bruta)
 # ---------------------------
 def break_caesar(cipher: str, scorer: QuadgramScorer, top_k: int = 5) -> List[Tuple[int, float, str]]:
     candidates = []
+    idx = encode_az(only_letters(cipher))
     for shift in range(1, 26):
-        pt = apply_caesar(only_letters(cipher), shift)
-        score = scorer.score(pt)
+        pt = decode_az((idx + (26 - shift)) % 26)
+        score = scorer._score_letters(pt)
         candidates.append((shift, score, pt))
     candidates.sort(key=lambda x: x[1], reverse=True)
     return candidates[:top_k]
@@ -108,119 +210,209 @@ def break_caesar(cipher: str, scorer: QuadgramScorer, top_k: int = 5) -> List[Tu
 # ---------------------------
 # Quebra por Substituição (hill-climbing + restarts) — versão simples
 # ---------------------------
-def random_key() -> Dict[str, str]:
-    """Gera uma chave aleatória (permuta o alfabeto). Mapeia CIPHER->PLAIN."""
-    perm = list(ALPHABET)
-    random.shuffle(perm)
-    return {c: p for c, p in zip(ALPHABET, perm)}
-
-def key_to_str(key_map: Dict[str, str]) -> str:
-    """Converte o dicionário de chave para string de 26 letras (A..Z -> PLAIN)."""
-    return "".join(key_map[c] for c in ALPHABET)
-
-def str_to_key(s: str) -> Dict[str, str]:
-    """Converte a string de 26 letras de volta para dicionário CIPHER->PLAIN."""
-    return {c: p for c, p in zip(ALPHABET, s)}
-
-def decrypt_with_key(cipher: str, key_s: str) -> str:
-    """Aplica a chave (string) ao texto cifrado e retorna apenas letras A..Z decifradas."""
-    return apply_substitution(only_letters(cipher), str_to_key(key_s))
-
-def tweak_key(key_s: str) -> str:
-    """Gera um vizinho trocando duas letras do mapeamento (swap simples)."""
-    i, j = random.sample(range(26), 2)
-    lst = list(key_s)
-    lst[i], lst[j] = lst[j], lst[i]
-    return "".join(lst)
-
-def frequency_seed_key(cipher: str) -> str:
+def random_key(rng: Optional[np.random.Generator] = None) -> Key:
+    """Gera uma chave aleatória (permuta o alfabeto). Mapeia CIPHER->PLAIN.
+    Sem 'rng', sorteia a partir do estado de 'random' (respeita random.seed)."""
+    if rng is None:
+        rng = np.random.default_rng(random.getrandbits(32))
+    return Key(rng.permutation(26).astype(np.uint8))
+
+def key_to_str(key: Key) -> str:
+    """Converte a chave para string de 26 letras (A..Z -> PLAIN), só para exibição."""
+    return decode_az(key)
+
+def str_to_key(s: str) -> Key:
+    """Converte a string de 26 letras de volta para a chave CIPHER->PLAIN."""
+    return Key(encode_az(s))
+
+def decrypt_with_key(cipher: str, key: Key) -> str:
+    """Aplica a chave ao texto cifrado e retorna apenas letras A..Z decifradas."""
+    return decode_az(key[encode_az(only_letters(cipher))])
+
+def frequency_seed_key(cipher: str) -> Key:
     """Semente baseada em frequência: mapeia as letras mais comuns do CIPHER
     para a ordem típica do inglês (ETAOIN...). É um bom chute inicial."""
-    ENG_FREQ = "ETAOINSHRDLCUMWFGYPBVKJXQZ"
-
-    # ordena letras do cifrado por frequência
-    cnt = Counter(ch for ch in only_letters(cipher))
-    cipher_order = "".join([c for c, _ in cnt.most_common()]) + \
-                   "".join(c for c in ALPHABET if c not in cnt)
+    ENG_FREQ = encode_az("ETAOINSHRDLCUMWFGYPBVKJXQZ")
+
+    # ordena letras do cifrado por frequência; empates pela primeira aparição
+    # e letras ausentes no fim, em ordem alfabética
+    idx = encode_az(only_letters(cipher))
+    counts = np.bincount(idx, minlength=26)
+    first = len(idx) + np.arange(26)
+    present, first_pos = np.unique(idx, return_index=True)
+    first[present] = first_pos
+    cipher_order = np.lexsort((first, -counts))
+
+    # posição i (A=0) da chave é a letra PLAIN para a letra i do CIPHER
+    key = np.empty(26, dtype=np.uint8)
+    key[cipher_order] = ENG_FREQ
+    return Key(key)
+
+def write_scores_log(
+    path: str,
+    initial_timestamp: float,
+    started: np.ndarray,
+    finished: np.ndarray,
+    patience: int,
+    initial_scores: np.ndarray,
+    scores: np.ndarray,
+    dones: np.ndarray,
+    improved: List[int],
+    cand_log: np.ndarray,
+    score_log: np.ndarray,
+    improved_log: np.ndarray,
+) -> None:
+    """Salva em CSV o histórico de um hill_climb_substitution (uma linha por evento).
+    started/finished: início e fim medidos de cada restart, em segundos desde o início da busca.
+    O laço compilado só lê o relógio no início e no fim de cada restart, então só as linhas
+    "initial", "restarting" e "really good candidate" têm timestamp/elapsed_time; nas
+    demais iterações essas células ficam vazias."""
+    restarts = len(initial_scores)
+
+    # colunas do log, pré-alocadas: initial + iterações + really good, por restart
+    n_rows = 2 * restarts + int(dones.sum())
+    types = np.empty(n_rows, dtype="<U21")
+    scores_this = np.empty(n_rows, dtype=np.float64)
+    scores_best = np.empty(n_rows, dtype=np.float64)
+    ii = np.empty(n_rows, dtype=np.int32)
+    jj = np.empty(n_rows, dtype=np.int32)  # -1 na linha "initial"
+    elapsed = np.empty(n_rows, dtype=np.float64)
+    pos = 0
+
+    def log(kind, this, best, i, j, ts):
+        nonlocal pos
+        k = len(kind) if isinstance(kind, np.ndarray) else 1
+        types[pos:pos+k] = kind
+        scores_this[pos:pos+k] = this
+        scores_best[pos:pos+k] = best
+        ii[pos:pos+k] = i
+        jj[pos:pos+k] = j
+        elapsed[pos:pos+k] = ts
+        pos += k
 
-    # constrói destino: posição i (A=0) é a letra PLAIN para a letra i do CIPHER
-    dest = ['?'] * 26
-    for i, c in enumerate(cipher_order[:26]):
-        dest[A2I[c]] = ENG_FREQ[i]
-
-    # completa eventuais buracos (se houver)
-    rest = [c for c in ALPHABET if c not in dest]
-    for i in range(26):
-        if dest[i] == '?':
-            dest[i] = rest.pop()
+    for i in range(restarts):
+        log("initial", initial_scores[i], initial_scores[i], i, -1, started[i])
 
-    return "".join(dest)
+    for i in range(restarts):
+        done = dones[i]
+        # sem medição por iteração: NaN vira célula vazia
+        timestamps = np.full(done, np.nan)
+        kinds = np.where(improved_log[i, :done], "good candidate", "bad candidate")
+        if done >= patience and not improved_log[i, done-patience:done].any():
+            kinds[-1] = "restarting"
+            timestamps[-1] = finished[i]  # o climb para logo após essa iteração
+        rows = np.arange(done)
+        if not LOG_EVERY:
+            rows = rows[kinds != "bad candidate"]
+        log(kinds[rows], cand_log[i, rows], score_log[i, rows], i, rows, timestamps[rows])
+
+        if i in improved:
+            log("really good candidate", scores[i], scores[i], i, done - 1, finished[i])
+
+    # células vazias: j da linha "initial", score de candidatos barrados pelo filtro
+    # e tempo das iterações
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([
+            "type", "this_iteration_score", "best_score_so_far", "i", "j", "timestamp", "elapsed_time"
+        ])
+        for kind, this, best, i, j, ts in zip(
+            types[:pos].tolist(), scores_this[:pos].tolist(), scores_best[:pos].tolist(),
+            ii[:pos].tolist(), jj[:pos].tolist(), elapsed[:pos].tolist(),
+        ):
+            writer.writerow([
+                kind, "" if math.isnan(this) else this, best, i, "" if j < 0 else j,
+                *(("", "") if math.isnan(ts) else (initial_timestamp + ts, ts)),
+            ])
 
 def hill_climb_substitution(
     cipher: str,
     scorer: QuadgramScorer,
     max_iters: int = 4000,
     restarts: int = 30,
-    patience: int = 800
+    patience: int = 800,
+    t0: float = 2.0,
+    cooling: float = 0.9995,
+    bigram_margin: float = BIGRAM_MARGIN,
+    log_path: Optional[str] = None
 ) -> Tuple[str, float]:
     """Quebra substituição monoalfabética por hill-climbing com vários restarts.
     - Começa de chaves semente (frequência + aleatórias)
-    - Faz swaps de duas letras; aceita se o score (quad-grams) melhora
-    - Se não melhora por 'patience' passos, reinicia
+    - Faz swaps de duas letras; aceita se o score (quad-grams) melhora, ou se piora
+      com probabilidade exp(delta/T) (simulated annealing; T parte de 't0' e é
+      multiplicada por 'cooling' a cada passo; t0=0 é hill-climbing puro)
+    - Se o melhor score não melhora por 'patience' passos, reinicia
+    - Swaps cujo delta de bigramas fica abaixo de -bigram_margin nem chegam a ser
+      pontuados por quad-grams (math.inf desliga o filtro)
+    Os restarts são independentes e rodam em paralelo, compilados
+    (ver hillclimb_nb.climb_restarts); o score de cada
+    candidato é incremental: um swap só altera os quad-grams que tocam posições
+    onde o cifrado é uma das duas letras trocadas.
+    Se 'log_path' for dado, salva ali um CSV com o histórico de scores.
     Retorna (melhor_plaintext, melhor_score)."""
 
-    best_text, best_score = "", -1e100
+    best_i, best_score = -1, -1e100
+
+    # representação em índices (A=0): o cifrado não muda durante a busca
+    table = scorer.table
+    cipher_letters = only_letters(cipher)
+    cipher_idx = encode_az(cipher_letters)
+    if len(cipher_idx) < 4:
+        # sem quad-grams para pontuar: mesmo sentinela de QuadgramScorer.score
+        return decrypt_with_key(cipher_letters, frequency_seed_key(cipher_letters)), -1e9
+    offsets, order = build_positions(cipher_idx)
+    all_starts = np.arange(max(0, len(cipher_idx) - 3))
 
     # sementes: 1 por frequência + algumas aleatórias
-    seeds: List[str] = [frequency_seed_key(cipher)]
+    seeds: List[Key] = [frequency_seed_key(cipher_letters)]
     for _ in range(max(1, restarts // 3)):
-        seeds.append(key_to_str(random_key()))
+        seeds.append(random_key())
     
-    infos = []
     initial_timestamp = get_timestamp()
+    clock0 = time.perf_counter()
 
+    # escolhe a semente e sorteia os swaps de cada restart antes de paralelizar
+    start_keys = np.empty((restarts, 26), dtype=np.uint8)
     for i in range(restarts):
-        key_s = random.choice(seeds)
-
-        plain = decrypt_with_key(cipher, key_s)
-        score = scorer.score(plain)
-        infos.append(("initial", score, score, i, None, get_timestamp()))
-
-        no_gain = 0
-        for j in range(max_iters):
-            cand_key = tweak_key(key_s)
-            cand_plain = decrypt_with_key(cipher, cand_key)
-            cand_score = scorer.score(cand_plain)
-
-            if cand_score > score:
-                key_s, plain, score = cand_key, cand_plain, cand_score
-                infos.append(("good candidate", cand_score, score, i, j, get_timestamp()))
-                no_gain = 0
-            else:
-                no_gain += 1
-                if no_gain >= patience:  # estagnou -> parte para outro restart
-                    infos.append(("restarting", cand_score, score, i, j, get_timestamp()))
-                    break
-                else:
-                    infos.append(("bad candidate", cand_score, score, i, j, get_timestamp()))
-
-        if score > best_score:
-            best_text, best_score = plain, score
-            infos.append(("really good candidate", score, score, i, j, get_timestamp()))
-    
-    df = pd.DataFrame(
-        infos, 
-        columns=["type", "this_iteration_score", "best_score_so_far", "i", "j", "timestamp"]
+        start_keys[i] = random.choice(seeds)
+    rng = np.random.default_rng(random.getrandbits(32))
+    swaps = draw_swaps(rng, restarts, max_iters)
+    uniforms = rng.random((restarts, max_iters))
+
+    # logs por iteração (uma linha por restart), preenchidos dentro do laço compilado
+    cand_log = np.empty((restarts, max_iters), dtype=np.float64)
+    score_log = np.empty((restarts, max_iters), dtype=np.float64)
+    improved_log = np.empty((restarts, max_iters), dtype=np.bool_)
+
+    # restarts sorteiam de poucas sementes: o score completo (ponto de partida de
+    # cada climb) é calculado uma vez por semente
+    seed_scores = {k.tobytes(): quadgram_sum(table, k[cipher_idx], all_starts) for k in seeds}
+    initial_scores = np.array(
+        [seed_scores[start_keys[i].tobytes()] for i in range(restarts)], dtype=np.float64
     )
-    df["elapsed_time"] = df["timestamp"] - initial_timestamp
 
-    filename = f"scores_{round(initial_timestamp)}.csv"
-    df.to_csv(
-        filename, 
-        index=False,
+    keys, scores, dones, started, finished = climb_restarts(
+        cipher_idx, start_keys, initial_scores, table, scorer.bigram_table, offsets, order,
+        swaps, uniforms, float(t0), float(cooling), patience, float(bigram_margin),
+        cand_log, score_log, improved_log,
     )
-    print(f"Dados de scores salvos em '{filename}'")
-    
+
+    # restarts que melhoraram o melhor score até então, na ordem
+    improved = []
+    for i in range(restarts):
+        if scores[i] > best_score:
+            best_i, best_score = i, float(scores[i])
+            improved.append(i)
+
+    if log_path is not None:
+        write_scores_log(
+            log_path, initial_timestamp, started - clock0, finished - clock0, patience,
+            initial_scores, scores, dones, improved, cand_log, score_log, improved_log,
+        )
+        print(f"Dados de scores salvos em '{log_path}'")
+
+    # só volta para texto no final
+    best_text = decode_az(keys[best_i][cipher_idx]) if best_i >= 0 else ""
     return best_text, best_score
 
 ## Heurística de decisão e main
@@ -11,6 +11,8 @@ def four_pairwise(iterable):
         a, b, c = b, c, d
 
 def form_quadgrams(letters):
+    if len(letters) < 4:
+        return []
     quadgrams = list(four_pairwise(letters))
    
     assert len(quadgrams) == len(letters)-3
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Laço interno do hill-climbing compilado com Numba.
+
+Tudo aqui trabalha em índices (A=0..Z=25):
+- cipher_idx: texto cifrado (só letras) como uint8
+- key_arr:    chave CIPHER->PLAIN como uint8[26]
+- table:      tabela densa (26,26,26,26) de log10-probabilidades dos quad-grams
+- bigram_table: idem (26,26) para bigramas, usada como filtro barato
+- offsets/order: mapa inverso de posições; as posições onde o cifrado é a letra c
+  são order[offsets[c]:offsets[c+1]]
+"""
+import time
+
+import numpy as np
+from numba import njit, objmode, prange
+
+
+def build_positions(cipher_idx: np.ndarray):
+    """Monta o mapa inverso (offsets, order) das posições de cada letra do cifrado."""
+    order = np.argsort(cipher_idx, kind="stable").astype(np.int64)
+    offsets = np.zeros(27, dtype=np.int64)
+    offsets[1:] = np.cumsum(np.bincount(cipher_idx, minlength=26))
+    return offsets, order
+
+
+def draw_swaps(rng: np.random.Generator, restarts: int, max_iters: int) -> np.ndarray:
+    """Sorteia de uma vez todos os swaps (pares de letras distintas) de cada restart.
+    Retorna um array uint8 de shape (restarts, max_iters, 2)."""
+    a = rng.integers(0, 26, size=(restarts, max_iters), dtype=np.uint8)
+    b = rng.integers(0, 25, size=(restarts, max_iters), dtype=np.uint8)
+    b += b >= a  # pula a própria letra a: b fica uniforme entre as outras 25
+    return np.stack((a, b), axis=-1)
+
+
+@njit(cache=True)
+def _swap_letter(v, x, y):
+    if v == x:
+        return y
+    if v == y:
+        return x
+    return v
+
+
+@njit(cache=True)
+def _sum_quads(table, plain, starts, n_starts, x, y):
+    """Soma dos quad-grams em 'starts' como se as letras PLAIN x e y estivessem trocadas
+    (x == y: texto atual)."""
+    s = 0.0
+    for k in range(n_starts):
+        i = starts[k]
+        s += table[_swap_letter(plain[i], x, y), _swap_letter(plain[i+1], x, y),
+                   _swap_letter(plain[i+2], x, y), _swap_letter(plain[i+3], x, y)]
+    return s
+
+
+@njit(cache=True)
+def _sum_bigrams(bigram_table, plain, starts, n_starts, x, y):
+    """Como _sum_quads, para bigramas."""
+    s = 0.0
+    for k in range(n_starts):
+        i = starts[k]
+        s += bigram_table[_swap_letter(plain[i], x, y), _swap_letter(plain[i+1], x, y)]
+    return s
+
+
+@njit(cache=True)
+def _affected_starts(offsets, order, a, b, size, n, starts, mark, stamp):
+    """Inícios dos n-grams de tamanho 'size' que tocam as posições das letras a e b
+    (sem repetição). Retorna quantos foram escritos em 'starts'."""
+    n_starts = 0
+    for c in (a, b):
+        for k in range(offsets[c], offsets[c+1]):
+            p = order[k]
+            for q in range(max(0, p - size + 1), min(p, n - size) + 1):
+                if mark[q] != stamp:
+                    mark[q] = stamp
+                    starts[n_starts] = q
+                    n_starts += 1
+    return n_starts
+
+
+@njit(cache=True)
+def climb(cipher_idx, key_arr, start_score, table, bigram_table, offsets, order, swaps, uniforms,
+          t0, cooling, patience, bigram_margin, cand_log, score_log, improved_log):
+    """Busca local a partir de key_arr (cujo score completo é start_score) trocando
+    duas letras da chave por iteração ('swaps', shape (max_iters, 2), ver draw_swaps).
+    Aceitação de Metropolis (simulated annealing): um swap que melhora é sempre
+    aceito; um que piora por delta é aceito se uniforms[it] < exp(delta/T), com
+    T começando em t0 e multiplicado por 'cooling' a cada iteração. Com t0 = 0
+    vira hill-climbing puro. Para após 'patience' iterações sem novo melhor score.
+    Antes do delta de quad-grams, cada swap passa por um filtro barato de bigramas:
+    se o delta de bigramas for <= -bigram_margin o candidato é rejeitado direto
+    (cand_log fica NaN). Com bigram_margin = inf o filtro fica desligado.
+    Preenche cand_log/score_log (melhor até então)/improved_log por iteração.
+    Retorna (melhor_chave, melhor_score, iterações_executadas, início, fim), com
+    início/fim lidos de time.perf_counter() (o laço em si não lê o relógio)."""
+    with objmode(t_start="float64"):
+        t_start = time.perf_counter()
+    key = key_arr.copy()
+    n = cipher_idx.shape[0]
+
+    plain = np.empty(n, dtype=np.uint8)
+    for i in range(n):
+        plain[i] = key[cipher_idx[i]]
+    score = start_score
+    best_key = key.copy()
+    best_score = score
+
+    # buffers reaproveitados entre iterações
+    starts = np.empty(4 * n, dtype=np.int64)
+    mark = np.full(n, -1, dtype=np.int64)
+    use_bigrams = bigram_margin < np.inf
+
+    temp = t0
+    no_gain = 0
+    done = 0
+    for it in range(swaps.shape[0]):
+        a, b = swaps[it, 0], swaps[it, 1]
+        # trocar a chave em a,b troca as letras PLAIN x,y no texto todo
+        x, y = key[a], key[b]
+
+        done = it + 1
+        passed = True
+        if use_bigrams:
+            n_starts = _affected_starts(offsets, order, a, b, 2, n, starts, mark, 2 * it)
+            bigram_delta = (_sum_bigrams(bigram_table, plain, starts, n_starts, x, y)
+                            - _sum_bigrams(bigram_table, plain, starts, n_starts, x, x))
+            passed = bigram_delta > -bigram_margin
+
+        accept = False
+        if passed:
+            n_starts = _affected_starts(offsets, order, a, b, 4, n, starts, mark, 2 * it + 1)
+            delta = (_sum_quads(table, plain, starts, n_starts, x, y)
+                     - _sum_quads(table, plain, starts, n_starts, x, x))
+            cand_score = score + delta
+            accept = delta > 0 or (temp > 0 and uniforms[it] < np.exp(delta / temp))
+        else:
+            cand_score = np.nan
+        cand_log[it] = cand_score
+        temp *= cooling
+
+        if accept:
+            score = cand_score
+            key[a], key[b] = y, x
+            for c in (a, b):
+                for k in range(offsets[c], offsets[c+1]):
+                    plain[order[k]] = key[c]
+
+        if score > best_score:
+            best_score = score
+            best_key[:] = key
+            improved_log[it] = True
+            no_gain = 0
+        else:
+            improved_log[it] = False
+            no_gain += 1
+        score_log[it] = best_score
+        if no_gain >= patience:  # estagnou -> parte para outro restart
+            break
+
+    with objmode(t_end="float64"):
+        t_end = time.perf_counter()
+    return best_key, best_score, done, t_start, t_end
+
+
+@njit(parallel=True, cache=True)
+def climb_restarts(cipher_idx, start_keys, start_scores, table, bigram_table, offsets, order,
+                   swaps, uniforms, t0, cooling, patience, bigram_margin,
+                   cand_log, score_log, improved_log):
+    """Roda um climb independente por linha de start_keys, em paralelo entre os núcleos.
+    Cada restart usa os próprios sorteios (swaps[r], uniforms[r]) e a própria linha dos logs
+    (shape (restarts, max_iters)), então o resultado não depende do escalonamento.
+    Retorna (chaves, scores, iterações_executadas, início, fim), um por restart;
+    início/fim são os time.perf_counter() medidos por cada climb."""
+    restarts = start_keys.shape[0]
+    keys = np.empty_like(start_keys)
+    scores = np.empty(restarts, dtype=np.float64)
+    done = np.empty(restarts, dtype=np.int64)
+    started = np.empty(restarts, dtype=np.float64)
+    finished = np.empty(restarts, dtype=np.float64)
+    for r in prange(restarts):
+        key, score, d, t_start, t_end = climb(
+            cipher_idx, start_keys[r], start_scores[r], table, bigram_table, offsets, order,
+            swaps[r], uniforms[r], t0, cooling, patience, bigram_margin,
+            cand_log[r], score_log[r], improved_log[r],
+        )
+        started[r] = t_start
+        finished[r] = t_end
+        keys[r] = key
+        scores[r] = score
+        done[r] = d
+    return keys, scores, done, started, finished
@@ -1,20 +1,19 @@
 from typing import List
-import re
 
-from config import ENCODED_FILE_PATH, ZERO, ONE
+import config
 
 
-REGEX_HAS_MORE_THAN_0_AND_1 = rf"[^{ZERO}{ONE}]"
-COMPILED_REGEX_HAS_MORE_THAN_0_AND_1 = re.compile(REGEX_HAS_MORE_THAN_0_AND_1)
-
 def read_encoded_file_content() -> List[str]: 
-    with open(ENCODED_FILE_PATH, "r") as f:
+    with open(config.ENCODED_FILE_PATH, "r") as f:
         content = f.read()
         binary_letters = content.split()
-    bits_needed = max(map(len, binary_letters))
-    zero_padded_chars = [binary_letter.rjust(bits_needed, ZERO) for binary_letter in binary_letters]
-    
-    if any(filter(COMPILED_REGEX_HAS_MORE_THAN_0_AND_1.search, zero_padded_chars)):
+
+    # junta os tokens (os mesmos separadores de split) e remove 0 e 1; o que sobrar não é binário
+    if "".join(binary_letters).translate(str.maketrans("", "", config.ZERO + config.ONE)):
         print("input is not binary")
 
+    zero = config.ZERO
+    bits_needed = max(map(len, binary_letters))
+    zero_padded_chars = [binary_letter.rjust(bits_needed, zero) for binary_letter in binary_letters]
+
     return zero_padded_chars
\ No newline at end of file